@@ -6,6 +6,7 @@ Double Set Single Point (DSSP) algorithm.
 import random
 import time
 from minesweeper import MinesweeperGame
+from replay import attach_recorder, write_game
 
 
 class MinesweeperSolverDSSP:
@@ -90,6 +91,81 @@ class MinesweeperSolverDSSP:
 
         return count_flagged + len(unmarked_neighbors) == bombs
 
+    def next_moves(self):
+        """
+        Apply the AFN and AMN rules to every revealed cell of the current position.
+        Mines found on the way count as marked and safe cells found on the way
+        are no longer unmarked, and the rules are applied again until nothing changes.
+
+        Returns:
+            tuple: The set of cells that are safe to probe and the set of cells
+                that are mines.
+        """
+        game = self.game
+        safe = set()
+        mines = set()
+        changed = True
+        while changed:
+            changed = False
+            for cell in game.revealed_cells:
+                neighbors = game.get_neighbors(cell)
+                unmarked_neighbors = [
+                    n for n in neighbors
+                    if n not in game.flags and n not in game.revealed_cells
+                    and n not in mines and n not in safe
+                ]
+                if not unmarked_neighbors:
+                    continue
+                bombs = game.count_adjacent_bombs(cell)
+                count_marked = sum(1 for n in neighbors if n in game.flags or n in mines)
+                # All Free Neighbor: every bomb around the cell is marked
+                if count_marked == bombs:
+                    safe.update(unmarked_neighbors)
+                    changed = True
+                # All Marked Neighbor: every unmarked neighbor is a bomb
+                elif count_marked + len(unmarked_neighbors) == bombs:
+                    mines.update(unmarked_neighbors)
+                    changed = True
+        return safe, mines
+
+    def guess_with_risk(self, mines=()):
+        """
+        Select the unknown cell least likely to be a bomb.
+
+        The risk of a cell next to revealed numbers is the highest ratio of
+        remaining bombs to hidden cells around these numbers, the risk of any
+        other cell is the density of the remaining bombs.
+
+        Args:
+            mines (iterable): Cells known to be mines but not flagged yet.
+
+        Returns:
+            tuple: The selected cell (row, col) and its estimated risk, or
+                (None, 0.0) if no unknown cell is left.
+        """
+        game = self.game
+        marked = game.flags.union(mines)
+        unknown = [
+            c for c in game.cells
+            if c not in game.revealed_cells and c not in marked
+        ]
+        if not unknown:
+            return None, 0.0
+        density = min(1.0, max(0, game.num_bombs - len(marked)) / len(unknown))
+        risks = {}
+        for cell in game.revealed_cells:
+            neighbors = game.get_neighbors(cell)
+            hidden = [n for n in neighbors if n not in game.revealed_cells and n not in marked]
+            if not hidden:
+                continue
+            remaining = game.count_adjacent_bombs(cell) - sum(1 for n in neighbors if n in marked)
+            risk = min(1.0, max(0.0, remaining / len(hidden)))
+            for n in hidden:
+                if risk > risks.get(n, -1.0):
+                    risks[n] = risk
+        best = min(unknown, key=lambda c: (risks.get(c, density), c))
+        return best, risks.get(best, density)
+
     def step_solve(self, max_steps=None):
         """
         Solve the Minesweeper game with the sets s (certain cells) and q (potential mines).
@@ -112,6 +188,8 @@ class MinesweeperSolverDSSP:
                 x = self.select_random()
                 if x is not None:
                     self.s.add(x)
+                    if self.game.recorder is not None:
+                        self.game.recorder.guess(x)
             # Break if max_steps is reached(only for testing)
             if max_steps is not None and index > max_steps:
                 break
@@ -178,13 +256,19 @@ class MinesweeperSolverDSSP:
                 time.sleep(2)
                 self.game.window.update()
 
-    def run_games(self, num_games: int , rows: int, cols: int, num_bombs: int):
+    def run_games(self, num_games: int , rows: int, cols: int, num_bombs: int, move_log=None,
+                  lazy: bool = False, topology=None):
         """
         Run multiple games and return the percentage of wins only
         if the opener is not a bomb
 
         Args:
             num_games (int): Number of games to run.
+            move_log (optional): Binary file object. If given, every played game is
+                                 seeded, recorded and appended to it (see replay.py).
+            lazy (bool): If True, the bombs are placed on the opener's probe, so the
+                         opener is always safe and every game is played.
+            topology (Topology, optional): Neighborhood topology of the games.
 
         Returns:
             float: Percentage of games won.
@@ -192,12 +276,23 @@ class MinesweeperSolverDSSP:
         wins = 0
         iterations = 0
         for _ in range(num_games):
-            game_instance = MinesweeperGame(rows, cols, num_bombs, gui=False)
+            if move_log is not None:
+                # Reseed so that the board and the guesses can be reproduced from the log
+                seed = random.getrandbits(32)
+                random.seed(seed)
+            # A lazy game draws its own seed from the reseeded stream, reusing the
+            # same seed for the board and the guesses would correlate them
+            game_instance = MinesweeperGame(rows, cols, num_bombs, gui=False, lazy=lazy,
+                                            topology=topology)
             self.game = game_instance
             # Check if the opener is not a bomb
-            if self.opener not in self.game.bomb_locations:
+            if lazy or self.opener not in self.game.bomb_locations:
                 iterations += 1
+                if move_log is not None:
+                    attach_recorder(self.game, seed)
                 self.step_solve()
                 if self.game.check_win():
                     wins += 1
+                if move_log is not None:
+                    write_game(move_log, self.game)
         return wins / iterations * 100
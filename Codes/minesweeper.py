@@ -6,6 +6,7 @@ including the game setup, processing user inputs, and managing game state.
 import random
 import tkinter as tk  # Importing tkinter for creating the graphical user interface
 from tkinter import messagebox
+from topology import RECTANGLE, Topology
 
 class MinesweeperGame:
     """
@@ -14,7 +15,8 @@ class MinesweeperGame:
     Attributes:
         grid_size (tuple): The size of the grid as (rows, columns).
         num_bombs (int): The total number of bombs in the game.
-        bomb_locations (list): List of bomb locations.
+        bomb_locations (set or list): Bomb locations, a list when generated eagerly
+                                      and a set in lazy mode.
         revealed_cells (set): Set of revealed cells.
         flags (set): Set of flagged cells.
         game_over (bool): Indicates if the game is over.
@@ -22,9 +24,20 @@ class MinesweeperGame:
         buttons (dict): Dictionary mapping cell coordinates to button objects.
         cols (int): Number of columns in the grid.
         rows (int): Number of rows in the grid.
+        recorder (MoveRecorder): Optional move recorder, None when logging is disabled.
+        lazy (bool): Indicates if the bombs are placed on the first probe.
+        seed (int): Seed of the lazy bomb generation.
+        bombs_generated (bool): Indicates if the bomb locations are known.
+        topology (Topology): Neighborhood topology of the grid.
+        adjacency_offsets (array): CSR offsets, the neighbors of the cell at flat index i
+                                   are adjacency[adjacency_offsets[i]:adjacency_offsets[i + 1]].
+        adjacency (array): Flat indices (row * cols + col) of the neighbors of every cell.
+        cells (list): Cell coordinates by flat index, shared with the topology.
     """
 
-    def __init__(self, rows: int, cols: int, num_bombs: int, gui: bool = True):
+    def __init__(self, rows: int, cols: int, num_bombs: int, gui: bool = True,
+                 lazy: bool = False, seed: int = None, clear_opening: bool = False,
+                 topology: Topology = None):
         """
         Initialize the Minesweeper game with the given parameters.
 
@@ -33,22 +46,64 @@ class MinesweeperGame:
             cols (int): Number of columns in the grid.
             num_bombs (int): Number of bombs in the game.
             gui (bool): If True, the GUI will be enabled.
+            lazy (bool): If True, the bombs are only placed on the first probe,
+                         which is therefore always safe.
+            seed (int, optional): Seed of the lazy bomb generation. A random seed is
+                                  drawn if None, so the layout can always be reproduced.
+            clear_opening (bool): In lazy mode, also keep the neighbors of the first
+                                  probe free of bombs when the grid has enough room.
+            topology (Topology, optional): Neighborhood topology, the bounded
+                                           8-neighborhood if None.
+
+        Raises:
+            ValueError: If lazy is True and the first probe cannot be kept free.
         """
         self.grid_size = (rows, cols)
         self.num_bombs = num_bombs
-        self.bomb_locations = self.generate_bomb_locations(rows, cols, num_bombs)
+        self.cols = cols
+        self.rows = rows
+        self.topology = topology if topology is not None else RECTANGLE
+        # Compiled once per topology and grid size, shared by every game
+        self.adjacency_offsets, self.adjacency, self.cells = self.topology.compile(rows, cols)
+        self.lazy = lazy
+        self.seed = seed
+        self.clear_opening = clear_opening
+        self._adjacent_counts = None
+        if lazy:
+            # The first probe is kept free, so it must leave room for every bomb
+            if not 0 <= num_bombs < rows * cols:
+                raise ValueError(
+                    f"A lazy {rows}x{cols} game needs between 0 and {rows * cols - 1} bombs"
+                )
+            if self.seed is None:
+                self.seed = random.getrandbits(32)
+            self._bomb_locations = set()
+            self.bombs_generated = False
+        else:
+            self.bomb_locations = self.generate_bomb_locations(rows, cols, num_bombs)
         self.revealed_cells = set()
         self.flags = set()
         self.game_over = False
         self.gui = gui
         self.buttons = {}
-        self.cols = cols
-        self.rows = rows
+        self.recorder = None
         if self.gui:
             self.window = tk.Tk()  # Create a new Tkinter window
             self.window.title("Minesweeper")  # Set the title of the window
             self.setup_gui(rows, cols)  # Set up the GUI
 
+    @property
+    def bomb_locations(self):
+        """Bomb locations, empty until the first probe in lazy mode."""
+        return self._bomb_locations
+
+    @bomb_locations.setter
+    def bomb_locations(self, bomb_locations):
+        # Assigning a layout invalidates the count grid, which is rebuilt on demand
+        self._bomb_locations = bomb_locations
+        self._adjacent_counts = None
+        self.bombs_generated = True
+
     def setup_gui(self, rows, cols):
         """
         Set up the graphical user interface for the Minesweeper game.
@@ -86,6 +141,10 @@ class MinesweeperGame:
         Args:
             cell (tuple): The (row, column) coordinates of the cell clicked.
         """
+        if self.recorder is not None:
+            self.recorder.probe(cell)
+        if not self.bombs_generated:
+            self.place_bombs(cell)
         if cell in self.bomb_locations:
             self.game_over = True
             if self.gui:
@@ -137,8 +196,29 @@ class MinesweeperGame:
         Returns:
             int: The number of bombs adjacent to the cell.
         """
-        neighbors = self.get_neighbors(cell)  # Get neighboring cells
-        return sum(1 for neighbor in neighbors if neighbor in self.bomb_locations)  # Count bombs
+        if self._adjacent_counts is None:
+            self._adjacent_counts = self.build_adjacent_counts(self.bomb_locations)
+        return self._adjacent_counts[cell[0] * self.cols + cell[1]]
+
+    def build_adjacent_counts(self, bomb_locations) -> list:
+        """
+        Build the grid of adjacent bomb counts for a bomb layout.
+
+        Args:
+            bomb_locations (iterable): The bomb locations.
+
+        Returns:
+            list: Flat list of counts, the count of (row, col) is at row * cols + col.
+        """
+        cols = self.cols
+        offsets = self.adjacency_offsets
+        adjacency = self.adjacency
+        counts = [0] * (self.rows * cols)
+        for row, col in bomb_locations:
+            index = row * cols + col
+            for neighbor in adjacency[offsets[index]:offsets[index + 1]]:
+                counts[neighbor] += 1
+        return counts
 
     def get_neighbors(self, cell: tuple) -> list:
         """
@@ -150,20 +230,14 @@ class MinesweeperGame:
         Returns:
             list: List of neighboring cell coordinates.
         """
-        # Extract the row and column from the cell
-        row, col = cell
-        rows, cols = self.grid_size  # Get total rows and columns
-        neighbors = []  # Initialize list for neighbors
-        # Loop through possible neighbor offsets
-        for dr in [-1, 0, 1]:  # Row offsets (-1, 0, 1)
-            for dc in [-1, 0, 1]:  # Column offsets (-1, 0, 1)
-                if dr == 0 and dc == 0:  # Skip the current cell
-                    continue
-                neighbor = (row + dr, col + dc)  # Calculate neighbor coordinates
-                # Check if the neighbor is within bounds
-                if 0 <= neighbor[0] < rows and 0 <= neighbor[1] < cols:
-                    neighbors.append(neighbor)  # Add valid neighbor to the list
-        return neighbors  # Return the list of neighboring cells
+        index = cell[0] * self.cols + cell[1]  # Flat index of the cell
+        cells = self.cells
+        # Read the neighbors from the compiled adjacency of the topology
+        return [
+            cells[neighbor]
+            for neighbor in self.adjacency[self.adjacency_offsets[index]:
+                                           self.adjacency_offsets[index + 1]]
+        ]
 
     def place_flag(self, cell: tuple):
         """
@@ -172,6 +246,8 @@ class MinesweeperGame:
         Args:
             cell (tuple): The (row, column) coordinates of the cell.
         """
+        if self.recorder is not None:
+            self.recorder.flag(cell)
         if cell not in self.revealed_cells:  # Only place a flag on unrevealed cells
             if cell in self.flags:  # If the cell is already flagged
                 self.flags.remove(cell)  # Remove the flag
@@ -212,6 +288,42 @@ class MinesweeperGame:
                 bomb_locations.add(location)
         return list(bomb_locations)
 
+    def place_bombs(self, first_cell: tuple):
+        """
+        Place the bombs of a lazy game away from the first probed cell, and
+        build the count grid in the same pass.
+
+        Args:
+            first_cell (tuple): The (row, column) coordinates of the first probe.
+        """
+        excluded = {first_cell}
+        if self.clear_opening:
+            opening = set(self.get_neighbors(first_cell)) | excluded
+            if self.rows * self.cols - len(opening) >= self.num_bombs:
+                excluded = opening
+        candidates = [cell for cell in self.cells if cell not in excluded]
+        bombs = random.Random(self.seed).sample(candidates, self.num_bombs)
+        self.bomb_locations = set(bombs)
+        self._adjacent_counts = self.build_adjacent_counts(bombs)
+
+    def load_position(self, revealed: dict, flags):
+        """
+        Load a player-visible position, the bomb layout staying unknown.
+        Meant for lazy games that are analyzed rather than played.
+
+        Args:
+            revealed (dict): Maps each revealed cell to its number of adjacent bombs.
+            flags (iterable): The flagged cells.
+        """
+        cols = self.cols
+        counts = [0] * (self.rows * cols)
+        for (row, col), count in revealed.items():
+            counts[row * cols + col] = count
+        self.revealed_cells = set(revealed)
+        self.flags = set(flags)
+        self.game_over = False
+        self._adjacent_counts = counts
+
 
 
 if __name__ == "__main__":
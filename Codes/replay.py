@@ -0,0 +1,415 @@
+"""
+This module contains the binary move log used to record Minesweeper games and
+the replayer used to reconstruct them, either headless or through the GUI.
+
+A log file is a sequence of game records. Each record is made of a fixed
+header (topology, rows, cols, number of bombs, seed, number of events), the bomb
+locations as pairs of unsigned shorts and the events packed in 32-bit words:
+the two high bits hold the kind of event, then 15 bits for the row and 15 bits
+for the column.
+"""
+
+import argparse
+import struct
+import sys
+from array import array
+from minesweeper import MinesweeperGame
+from topology import TOPOLOGIES
+
+PROBE = 0
+FLAG = 1
+GUESS = 2
+
+MAGIC = b"MSRL"
+VERSION = 2
+# magic, version, topology, rows, cols, num_bombs, seed, num_events
+HEADER = struct.Struct("<4sBBHHHQI")
+
+_KIND_SHIFT = 30
+_ROW_SHIFT = 15
+_COORD_MASK = 0x7FFF
+# Largest number of rows or columns whose coordinates fit in an event
+MAX_GRID_SIZE = _COORD_MASK + 1
+# Largest number of bombs that fits in the header
+MAX_BOMBS = 0xFFFF
+_EVENT_TYPE = "I" if array("I").itemsize == 4 else "L"
+
+
+def pack_event(kind: int, cell: tuple) -> int:
+    """
+    Pack an event into a single 32-bit word.
+
+    Args:
+        kind (int): PROBE, FLAG or GUESS.
+        cell (tuple): The (row, column) coordinates of the cell.
+
+    Returns:
+        int: The packed event.
+    """
+    return kind << _KIND_SHIFT | cell[0] << _ROW_SHIFT | cell[1]
+
+
+def unpack_event(event: int) -> tuple:
+    """
+    Unpack an event packed with pack_event.
+
+    Args:
+        event (int): The packed event.
+
+    Returns:
+        tuple: The kind of the event and the (row, column) coordinates of the cell.
+    """
+    return event >> _KIND_SHIFT, ((event >> _ROW_SHIFT) & _COORD_MASK, event & _COORD_MASK)
+
+
+class MoveRecorder:
+    """
+    Record the moves played on a game as a packed stream of events.
+
+    Attributes:
+        seed (int): Seed the game was generated from.
+        events (array): Packed events, in the order they were played.
+    """
+
+    def __init__(self, seed: int = 0):
+        """
+        Initialize an empty recorder.
+
+        Args:
+            seed (int): Seed the game was generated from.
+        """
+        self.seed = seed
+        self.events = array(_EVENT_TYPE)
+
+    def probe(self, cell: tuple):
+        """Record a probe on a cell."""
+        self.events.append(pack_event(PROBE, cell))
+
+    def flag(self, cell: tuple):
+        """Record a flag placed or removed on a cell."""
+        self.events.append(pack_event(FLAG, cell))
+
+    def guess(self, cell: tuple):
+        """Record that the solver had to guess the cell it probes next."""
+        self.events.append(pack_event(GUESS, cell))
+
+
+class GameRecord:
+    """
+    A game read back from a move log.
+
+    Attributes:
+        topology (Topology): Neighborhood topology of the grid.
+        rows (int): Number of rows in the grid.
+        cols (int): Number of columns in the grid.
+        seed (int): Seed the game was generated from.
+        bomb_locations (list): List of bomb locations.
+        events (array): Packed events, in the order they were played.
+    """
+
+    def __init__(self, topology, rows: int, cols: int, seed: int, bomb_locations: list,
+                 events: array):
+        self.topology = topology
+        self.rows = rows
+        self.cols = cols
+        self.seed = seed
+        self.bomb_locations = bomb_locations
+        self.events = events
+
+
+def attach_recorder(game: MinesweeperGame, seed: int = None) -> MoveRecorder:
+    """
+    Start recording the moves played on a game.
+
+    Args:
+        game (MinesweeperGame): The game to record.
+        seed (int, optional): Seed the game was generated from, defaults to the
+                              seed of the game (0 if it has none).
+
+    Returns:
+        MoveRecorder: The recorder attached to the game.
+    """
+    if seed is None:
+        seed = game.seed if game.seed is not None else 0
+    game.recorder = MoveRecorder(seed)
+    return game.recorder
+
+
+def write_game(stream, game: MinesweeperGame):
+    """
+    Append a recorded game to a binary stream.
+
+    Args:
+        stream: File object opened in binary mode.
+        game (MinesweeperGame): A game with a recorder attached.
+
+    Raises:
+        ValueError: If the topology, the size or the number of bombs of the game
+            cannot be stored in a move log.
+    """
+    if game.topology.code not in TOPOLOGIES:
+        raise ValueError(f"Topology {game.topology.name!r} cannot be stored in a move log")
+    if game.rows > MAX_GRID_SIZE or game.cols > MAX_GRID_SIZE:
+        raise ValueError(f"A {game.rows}x{game.cols} grid cannot be stored in a move log, "
+                         f"rows and cols are limited to {MAX_GRID_SIZE}")
+    if len(game.bomb_locations) > MAX_BOMBS:
+        raise ValueError(f"{len(game.bomb_locations)} bombs cannot be stored in a move log, "
+                         f"the limit is {MAX_BOMBS}")
+    recorder = game.recorder
+    bombs = array("H")
+    for row, col in sorted(game.bomb_locations):
+        bombs.append(row)
+        bombs.append(col)
+    events = recorder.events
+    if sys.byteorder == "big":
+        bombs.byteswap()
+        events = array(_EVENT_TYPE, events)
+        events.byteswap()
+    stream.write(HEADER.pack(MAGIC, VERSION, game.topology.code, game.rows, game.cols,
+                             len(bombs) // 2, recorder.seed, len(events)))
+    stream.write(bombs.tobytes())
+    stream.write(events.tobytes())
+
+
+def read_games(stream) -> list:
+    """
+    Read every game record from a binary stream.
+
+    Args:
+        stream: File object opened in binary mode.
+
+    Returns:
+        list: List of GameRecord.
+
+    Raises:
+        ValueError: If the stream is not a valid move log.
+    """
+    records = []
+    while True:
+        header = stream.read(HEADER.size)
+        if not header:
+            return records
+        if len(header) < HEADER.size:
+            raise ValueError("Truncated move log header")
+        magic, version, code, rows, cols, num_bombs, seed, num_events = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a move log or unsupported version")
+        if code not in TOPOLOGIES:
+            raise ValueError(f"Unknown topology {code} in move log")
+        bombs = array("H")
+        events = array(_EVENT_TYPE)
+        try:
+            bombs.fromfile(stream, 2 * num_bombs)
+            events.fromfile(stream, num_events)
+        except EOFError as error:
+            raise ValueError("Truncated move log record") from error
+        if sys.byteorder == "big":
+            bombs.byteswap()
+            events.byteswap()
+        bomb_locations = list(zip(bombs[::2], bombs[1::2]))
+        records.append(GameRecord(TOPOLOGIES[code], rows, cols, seed, bomb_locations, events))
+
+
+def read_log(path: str) -> list:
+    """
+    Read every game record from a move log file.
+
+    Args:
+        path (str): Path of the move log.
+
+    Returns:
+        list: List of GameRecord.
+    """
+    with open(path, "rb") as stream:
+        return read_games(stream)
+
+
+class MoveReplayer:
+    """
+    Reconstruct the state of a recorded game after any number of moves.
+
+    A keyframe (revealed cells, flags, game over) is stored every
+    keyframe_interval events, so seeking to move N only replays the events
+    between the closest keyframe and N.
+
+    Attributes:
+        record (GameRecord): The game being replayed.
+        keyframe_interval (int): Number of events between two keyframes.
+        keyframes (list): Snapshots of the game state taken every keyframe_interval events.
+    """
+
+    def __init__(self, record: GameRecord, keyframe_interval: int = 64):
+        """
+        Initialize the replayer and build the keyframes in a single headless pass.
+
+        Args:
+            record (GameRecord): The game to replay.
+            keyframe_interval (int): Number of events between two keyframes.
+        """
+        self.record = record
+        self.keyframe_interval = keyframe_interval
+        self.keyframes = []
+        game = self.new_game(gui=False)
+        for index, event in enumerate(record.events):
+            if index % keyframe_interval == 0:
+                self.keyframes.append(self.snapshot(game))
+            self.apply_event(game, event)
+        if len(record.events) % keyframe_interval == 0:
+            self.keyframes.append(self.snapshot(game))
+
+    def __len__(self) -> int:
+        """Return the number of recorded events."""
+        return len(self.record.events)
+
+    def new_game(self, gui: bool) -> MinesweeperGame:
+        """
+        Create a game with the recorded board and no move played.
+
+        Args:
+            gui (bool): If True, the GUI will be enabled.
+
+        Returns:
+            MinesweeperGame: The new game.
+        """
+        record = self.record
+        # Lazy mode skips the random generation, the recorded layout is assigned instead
+        game = MinesweeperGame(record.rows, record.cols, len(record.bomb_locations), gui=gui,
+                               lazy=True, seed=record.seed, topology=record.topology)
+        game.bomb_locations = set(record.bomb_locations)
+        return game
+
+    @staticmethod
+    def snapshot(game: MinesweeperGame) -> tuple:
+        """Return an immutable copy of the state of a game."""
+        return frozenset(game.revealed_cells), frozenset(game.flags), game.game_over
+
+    @staticmethod
+    def apply_event(game: MinesweeperGame, event: int):
+        """
+        Play a packed event on a game. Guesses only annotate the next probe.
+
+        Args:
+            game (MinesweeperGame): The game to update.
+            event (int): The packed event.
+        """
+        kind, cell = unpack_event(event)
+        if kind == PROBE:
+            game.process_event(cell)
+        elif kind == FLAG:
+            game.place_flag(cell)
+
+    def seek(self, move: int) -> MinesweeperGame:
+        """
+        Reconstruct the game as it was after the first `move` events.
+
+        Args:
+            move (int): Number of events to play, between 0 and len(self).
+
+        Returns:
+            MinesweeperGame: A headless game in the requested state.
+
+        Raises:
+            IndexError: If move is out of range.
+        """
+        if not 0 <= move <= len(self):
+            raise IndexError("move out of range")
+        game = self.new_game(gui=False)
+        keyframe = move // self.keyframe_interval
+        revealed, flags, game.game_over = self.keyframes[keyframe]
+        game.revealed_cells = set(revealed)
+        game.flags = set(flags)
+        for event in self.record.events[keyframe * self.keyframe_interval:move]:
+            self.apply_event(game, event)
+        return game
+
+    def play(self, start: int = 0, delay_ms: int = 100):
+        """
+        Replay the game in the Tkinter GUI, starting from move `start`.
+
+        Args:
+            start (int): Number of events already played when the window opens.
+            delay_ms (int): Delay between two events, in milliseconds.
+        """
+        state = self.seek(start)
+        game = self.new_game(gui=True)
+        for cell in state.revealed_cells:
+            game.reveal_cell(cell)
+        for cell in state.flags:
+            game.place_flag(cell)
+        game.game_over = state.game_over
+        events = self.record.events
+
+        def step(index):
+            if index < len(events):
+                self.apply_event(game, events[index])
+                game.window.after(delay_ms, step, index + 1)
+
+        game.window.after(delay_ms, step, start)
+        game.start_game()
+
+
+def render_board(game: MinesweeperGame) -> str:
+    """
+    Render the player-visible board as text.
+
+    Args:
+        game (MinesweeperGame): The game to render.
+
+    Returns:
+        str: One line per row, '.' for hidden cells, 'F' for flags and the
+            number of adjacent bombs for revealed cells.
+    """
+    lines = []
+    for row in range(game.rows):
+        line = []
+        for col in range(game.cols):
+            cell = (row, col)
+            if cell in game.flags:
+                line.append("F")
+            elif cell in game.revealed_cells:
+                line.append(str(game.count_adjacent_bombs(cell)))
+            else:
+                line.append(".")
+        lines.append("".join(line))
+    return "\n".join(lines)
+
+
+def main():
+    """ Print or replay a game from a move log. """
+    parser = argparse.ArgumentParser(description="Replay a game from a Minesweeper move log.")
+    parser.add_argument("log", help="path of the move log")
+    parser.add_argument("--game", type=int, default=0, help="index of the game in the log")
+    parser.add_argument("--move", type=int, default=None,
+                        help="number of moves to play (default: all)")
+    parser.add_argument("--gui", action="store_true", help="replay the game in the GUI")
+    parser.add_argument("--delay", type=int, default=100, help="GUI delay between moves in ms")
+    args = parser.parse_args()
+
+    try:
+        records = read_log(args.log)
+    except (OSError, ValueError) as error:
+        parser.error(f"cannot read {args.log}: {error}")
+    if not records:
+        parser.error(f"{args.log} contains no game")
+    if not 0 <= args.game < len(records):
+        parser.error(f"--game must be between 0 and {len(records) - 1} "
+                     f"({len(records)} games in the log)")
+    replayer = MoveReplayer(records[args.game])
+    move = len(replayer) if args.move is None else args.move
+    if not 0 <= move <= len(replayer):
+        parser.error(f"--move must be between 0 and {len(replayer)}")
+    if args.gui:
+        replayer.play(0 if args.move is None else move, args.delay)
+        return
+    game = replayer.seek(move)
+    print(f"Game {args.game}/{len(records)}: {replayer.record.rows}x{replayer.record.cols} "
+          f"{replayer.record.topology.name}, "
+          f"{len(replayer.record.bomb_locations)} bombs, seed {replayer.record.seed}, "
+          f"move {move}/{len(replayer)}")
+    print(render_board(game))
+    if game.game_over:
+        print("Won" if game.check_win() else "Lost")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+"""
+This module contains a local solve-service: a long-running process that keeps
+a pool of warm DSSP workers and answers batches of player-visible positions.
+
+The protocol is one JSON object per line, on stdin/stdout or on a Unix socket.
+A request is {"id": ..., "positions": [position, ...]} where a position is
+
+    {"rows": 9, "cols": 9, "bombs": 10, "topology": "rectangle",
+     "board": ["0001F....", ...]}
+
+with '.' for hidden cells, 'F' for flags and digits for revealed cells. The
+response is {"id": ..., "results": [result, ...]} where a result is
+
+    {"safe": [[r, c], ...], "flags": [[r, c], ...],
+     "guess": {"cell": [r, c], "risk": 0.12} or null}
+
+A guess is only given when no cell is known to be safe, and an invalid
+position gets {"error": message} without failing the rest of the request.
+Requests are pipelined: they are dispatched to the pool as soon as they are
+read and the responses are written in the same order. Results are cached by position hash.
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import socketserver
+import sys
+import threading
+from collections import OrderedDict
+from minesweeper import MinesweeperGame
+from dssp_solver import MinesweeperSolverDSSP
+from topology import TOPOLOGIES
+
+TOPOLOGY_NAMES = {topology.name: topology for topology in TOPOLOGIES.values()}
+# Games prepared when a worker starts (beginner, intermediate, expert)
+STANDARD_GAMES = ((9, 9, 10), (16, 16, 40), (16, 30, 99))
+
+# Maximum number of solvers kept warm in a worker
+SOLVER_CACHE_SIZE = 32
+
+# Solvers kept warm in a worker, by (rows, cols, bombs, topology code),
+# least recently used first
+_solvers = OrderedDict()
+
+
+def get_solver(rows: int, cols: int, bombs: int, topology) -> MinesweeperSolverDSSP:
+    """Return the warm solver of a game shape, building it on first use."""
+    key = (rows, cols, bombs, topology.code)
+    solver = _solvers.get(key)
+    if solver is None:
+        game = MinesweeperGame(rows, cols, bombs, gui=False, lazy=True, seed=0, topology=topology)
+        solver = _solvers[key] = MinesweeperSolverDSSP(game)
+        if len(_solvers) > SOLVER_CACHE_SIZE:
+            _solvers.popitem(last=False)
+    else:
+        _solvers.move_to_end(key)
+    return solver
+
+
+def _init_worker():
+    """Warm a worker: build the solvers of the standard games for every topology."""
+    # Ctrl+C is handled by the service, the workers finish the positions they hold
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for topology in TOPOLOGIES.values():
+        for rows, cols, bombs in STANDARD_GAMES:
+            get_solver(rows, cols, bombs, topology)
+
+
+def parse_position(position: dict) -> tuple:
+    """
+    Parse a player-visible position.
+
+    Args:
+        position (dict): The position, as described in the module docstring.
+
+    Returns:
+        tuple: rows, cols, bombs, topology, revealed cells with their count, flags.
+
+    Raises:
+        ValueError: If the position is malformed or a count is larger than the
+            number of neighbors of its cell or than the number of bombs.
+    """
+    try:
+        rows, cols, bombs = int(position["rows"]), int(position["cols"]), int(position["bombs"])
+        topology = TOPOLOGY_NAMES[position.get("topology", "rectangle")]
+        board = position["board"]
+    except (KeyError, TypeError) as error:
+        raise ValueError(f"Invalid position: {error!r}") from error
+    if not isinstance(board, list) or any(not isinstance(line, str) for line in board):
+        raise ValueError("Board must be a list of strings")
+    if len(board) != rows or any(len(line) != cols for line in board):
+        raise ValueError(f"Board does not match a {rows}x{cols} grid")
+    offsets = topology.compile(rows, cols)[0]
+    revealed = {}
+    flags = set()
+    for row, line in enumerate(board):
+        for col, char in enumerate(line):
+            if char == "F":
+                flags.add((row, col))
+            elif char.isdigit():
+                count = int(char)
+                index = row * cols + col
+                if count > min(offsets[index + 1] - offsets[index], bombs):
+                    raise ValueError(f"Impossible count {count} at ({row}, {col})")
+                revealed[(row, col)] = count
+            elif char != ".":
+                raise ValueError(f"Invalid cell {char!r} at ({row}, {col})")
+    return rows, cols, bombs, topology, revealed, flags
+
+
+def analyze_position(position: dict) -> dict:
+    """
+    Compute the next moves of a position with a warm solver.
+
+    Args:
+        position (dict): The position, as described in the module docstring.
+
+    Returns:
+        dict: The result, as described in the module docstring.
+    """
+    rows, cols, bombs, topology, revealed, flags = parse_position(position)
+    solver = get_solver(rows, cols, bombs, topology)
+    solver.game.load_position(revealed, flags)
+    safe, mines = solver.next_moves()
+    guess = None
+    if not safe:
+        cell, risk = solver.guess_with_risk(mines)
+        if cell is not None:
+            guess = {"cell": list(cell), "risk": round(risk, 4)}
+    return {
+        "safe": [list(cell) for cell in sorted(safe)],
+        "flags": [list(cell) for cell in sorted(mines)],
+        "guess": guess,
+    }
+
+
+def analyze_batch(positions: list) -> list:
+    """
+    Analyze a batch of positions in a worker.
+
+    Returns:
+        list: One result per position, or {"error": message} for invalid ones.
+    """
+    results = []
+    for position in positions:
+        try:
+            results.append(analyze_position(position))
+        except ValueError as error:
+            results.append({"error": str(error)})
+    return results
+
+
+def position_key(position: dict) -> bytes:
+    """
+    Hash a position, two equal positions having the same key.
+
+    Raises:
+        ValueError: If the position is malformed.
+    """
+    try:
+        text = "{}:{}:{}:{}:{}".format(position["rows"], position["cols"], position["bombs"],
+                                        position.get("topology", "rectangle"),
+                                        "/".join(position["board"]))
+    except (KeyError, TypeError, AttributeError) as error:
+        raise ValueError(f"Invalid position: {error!r}") from error
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+class PendingResponse:
+    """
+    Response to a request, possibly still being computed by the pool.
+
+    Attributes:
+        request_id: Identifier of the request.
+        results (list): Results by position, None while computed by the pool.
+    """
+
+    def __init__(self, service, request_id, results, missing=None, sources=None, error=None):
+        """
+        Args:
+            service (SolveService): The service the request was submitted to.
+            request_id: Identifier of the request.
+            results (list): Results by position, None for the missing ones.
+            missing (dict): Indices of the missing positions, by position key.
+            sources (dict): (AsyncResult, index in its batch) of each missing key.
+            error (str, optional): Error returned instead of the results.
+        """
+        self.service = service
+        self.request_id = request_id
+        self.results = results
+        self.missing = missing or {}
+        self.sources = sources or {}
+        self.error = error
+
+    def result(self) -> dict:
+        """Wait for the pool if needed and return the response."""
+        if self.error is not None:
+            return {"id": self.request_id, "error": self.error}
+        computed = {}
+        try:
+            for key, (pending, index) in self.sources.items():
+                computed[key] = pending.get()[index]
+        except Exception as error:  # pylint: disable=broad-except
+            # A failing worker must not stop the responses that follow
+            self.service.finish({key: None for key in self.sources})
+            return {"id": self.request_id, "error": f"Worker failure: {error!r}"}
+        self.service.finish(computed)
+        for key, indices in self.missing.items():
+            for index in indices:
+                self.results[index] = computed[key]
+        self.missing = {}
+        self.sources = {}
+        return {"id": self.request_id, "results": self.results}
+
+
+class SolveService:
+    """
+    Pool of warm DSSP workers with a cache of results by position hash.
+
+    Attributes:
+        pool (multiprocessing.Pool): The worker pool.
+        cache (OrderedDict): Results by position key, least recently used first.
+        cache_size (int): Maximum number of cached results.
+        inflight (dict): (AsyncResult, index in its batch) of the positions being
+                         computed, so that a repeated position is computed once.
+        hits (int): Number of positions answered from the cache or from a
+                    position already being computed.
+    """
+
+    def __init__(self, processes: int = None, cache_size: int = 100_000):
+        """
+        Start the worker pool.
+
+        Args:
+            processes (int, optional): Number of workers, the number of CPUs if None.
+            cache_size (int): Maximum number of cached results.
+        """
+        self.pool = multiprocessing.Pool(processes, initializer=_init_worker)
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.inflight = {}
+        self.hits = 0
+        self.lock = threading.Lock()
+
+    def close(self):
+        """Stop the worker pool."""
+        self.pool.close()
+        self.pool.join()
+
+    def finish(self, results: dict):
+        """
+        Record computed positions: cache their results, evicting the least
+        recently used ones, and stop tracking them as being computed.
+
+        Args:
+            results (dict): Results by position key, None if the computation failed.
+        """
+        with self.lock:
+            for key, result in results.items():
+                if result is not None and "error" not in result:
+                    self.cache[key] = result
+                    if len(self.cache) > self.cache_size:
+                        self.cache.popitem(last=False)
+                self.inflight.pop(key, None)
+
+    def submit(self, request) -> PendingResponse:
+        """
+        Answer the cached positions of a request and send the others to the pool,
+        without waiting for them.
+
+        Args:
+            request (dict): The request, as described in the module docstring.
+
+        Returns:
+            PendingResponse: The response to the request.
+        """
+        request_id = request.get("id") if isinstance(request, dict) else None
+        positions = request.get("positions") if isinstance(request, dict) else None
+        if not isinstance(positions, list):
+            return PendingResponse(self, request_id, None,
+                                   error="Invalid request: positions must be a list")
+        results = [None] * len(positions)
+        keys = {}
+        for index, position in enumerate(positions):
+            try:
+                keys[index] = position_key(position)
+            except ValueError as error:
+                # Only this position fails, the others of the batch are still answered
+                results[index] = {"error": str(error)}
+        missing = {}
+        sources = {}
+        with self.lock:
+            for index, key in keys.items():
+                cached = self.cache.get(key)
+                if cached is not None:
+                    self.cache.move_to_end(key)
+                    results[index] = cached
+                    self.hits += 1
+                else:
+                    missing.setdefault(key, []).append(index)
+            new_keys = []
+            for key in missing:
+                if key in self.inflight:
+                    # Already sent to the pool by an earlier request
+                    sources[key] = self.inflight[key]
+                    self.hits += 1
+                else:
+                    new_keys.append(key)
+            if new_keys:
+                batch = [positions[missing[key][0]] for key in new_keys]
+                pending = self.pool.apply_async(analyze_batch, (batch,))
+                for index, key in enumerate(new_keys):
+                    sources[key] = self.inflight[key] = (pending, index)
+        return PendingResponse(self, request_id, results, missing, sources)
+
+    def serve_stream(self, infile, outfile):
+        """
+        Answer the requests read from a text stream, one JSON object per line.
+
+        Args:
+            infile: Stream the requests are read from.
+            outfile: Stream the responses are written to, in the order of the requests.
+        """
+        responses = queue.Queue()
+
+        def write_responses():
+            while True:
+                response = responses.get()
+                if response is None:
+                    break
+                outfile.write(json.dumps(response.result()) + "\n")
+                if responses.empty():  # Flush once the pipeline is drained
+                    outfile.flush()
+            outfile.flush()
+
+        writer = threading.Thread(target=write_responses)
+        writer.start()
+        try:
+            for line in infile:
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                except ValueError as error:
+                    responses.put(PendingResponse(self, None, None,
+                                                  error=f"Invalid JSON: {error}"))
+                    continue
+                responses.put(self.submit(request))
+        finally:
+            # Always stop the writer, also on Ctrl+C, or the process never exits
+            responses.put(None)
+            writer.join()
+
+    def serve_unix(self, path: str):
+        """
+        Answer the requests of every connection to a Unix socket until interrupted.
+
+        Args:
+            path (str): Path of the socket.
+        """
+        service = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            """Serve one connection with the stream protocol."""
+
+            def handle(self):
+                with self.request.makefile("r", encoding="utf-8") as infile, \
+                     self.request.makefile("w", encoding="utf-8") as outfile:
+                    service.serve_stream(infile, outfile)
+
+        try:
+            with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+                # Do not wait for connected clients when the service stops
+                server.daemon_threads = True
+                server.serve_forever()
+        finally:
+            # Remove the socket file, or the next start fails with "Address already in use"
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+
+def main():
+    """ Run the solve-service on stdin/stdout or on a Unix socket. """
+    parser = argparse.ArgumentParser(description="Local DSSP solve-service.")
+    parser.add_argument("--socket", help="serve on this Unix socket instead of stdin/stdout")
+    parser.add_argument("--workers", type=int, default=None, help="number of solver workers")
+    parser.add_argument("--cache-size", type=int, default=100_000,
+                        help="maximum number of cached results")
+    args = parser.parse_args()
+
+    service = SolveService(args.workers, args.cache_size)
+    try:
+        if args.socket:
+            service.serve_unix(args.socket)
+        else:
+            service.serve_stream(sys.stdin, sys.stdout)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
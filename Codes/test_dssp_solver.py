@@ -56,6 +56,20 @@ class TestMinesweeperSolverDSSP(unittest.TestCase):
         self.game.bomb_locations = {(1, 0)}
         self.assertTrue(self.solver.is_all_marked_neighbor(cell))
 
+    def test_next_moves(self):
+        """Test the safe cells and mines deduced from a visible position."""
+        game = MinesweeperGame(3, 3, 1, gui=False, lazy=True)
+        # Column 2 is hidden except (2, 2), so (2, 1) sees a single hidden cell
+        game.load_position({(0, 0): 0, (1, 0): 0, (2, 0): 0, (0, 1): 1, (1, 1): 1,
+                            (2, 1): 1, (2, 2): 1}, set())
+        solver = MinesweeperSolverDSSP(game)
+        safe, mines = solver.next_moves()
+        # (1, 2) is a mine, which in turn makes (0, 2) safe around (0, 1)
+        self.assertEqual(safe, {(0, 2)})
+        self.assertEqual(mines, {(1, 2)})
+        # Once (1, 2) is known, (0, 2) carries no risk
+        self.assertEqual(solver.guess_with_risk(mines), ((0, 2), 0.0))
+
     def test_step_solve_win(self):
         """Test the solver's ability to win a game."""
         game = MinesweeperGame(5, 5, 4, False)
@@ -95,5 +109,11 @@ class TestMinesweeperSolverDSSP(unittest.TestCase):
         # Check that the win rate is between 0 and 100
         self.assertTrue(0 <= win_rate <= 100)
 
+    def test_run_games_lazy(self):
+        """Test the run_games method when the bombs are placed on the opener's probe."""
+        win_rate = self.solver.run_games(5, 5, 5, 24, lazy=True)
+        # Only the opener is safe, so every game is played and won
+        self.assertEqual(win_rate, 100)
+
 if __name__ == "__main__":
     unittest.main()
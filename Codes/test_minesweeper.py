@@ -70,6 +70,47 @@ class TestMinesweeperGame(unittest.TestCase):
         self.game.process_event((1, 0))
         self.assertTrue(self.game.check_win())  # Check if the win condition is met
 
+    def test_lazy_generation(self):
+        """Test that a lazy game places its bombs on the first probe, away from it."""
+        game = MinesweeperGame(9, 9, 10, gui=False, lazy=True, seed=7)
+        self.assertFalse(game.bombs_generated)
+        self.assertEqual(len(game.bomb_locations), 0)
+        game.process_event((4, 4))
+        self.assertTrue(game.bombs_generated)
+        self.assertEqual(len(game.bomb_locations), 10)
+        self.assertNotIn((4, 4), game.bomb_locations)
+        self.assertFalse(game.game_over)
+        # Same seed and same first probe give the same layout
+        other = MinesweeperGame(9, 9, 10, gui=False, lazy=True, seed=7)
+        other.process_event((4, 4))
+        self.assertEqual(other.bomb_locations, game.bomb_locations)
+
+    def test_lazy_too_many_bombs(self):
+        """Test that a lazy game rejects a bomb count that fills the grid."""
+        with self.assertRaises(ValueError):
+            MinesweeperGame(3, 3, 9, gui=False, lazy=True)
+        game = MinesweeperGame(3, 3, 8, gui=False, lazy=True)
+        game.process_event((1, 1))
+        self.assertEqual(game.revealed_cells, {(1, 1)})
+
+    def test_lazy_clear_opening(self):
+        """Test that a clear opening leaves no bomb around the first probe."""
+        game = MinesweeperGame(9, 9, 30, gui=False, lazy=True, clear_opening=True)
+        game.process_event((0, 0))
+        self.assertEqual(game.count_adjacent_bombs((0, 0)), 0)
+        self.assertGreater(len(game.revealed_cells), 0)
+
+    def test_adjacent_counts_grid(self):
+        """Test that the count grid matches the bombs and follows new layouts."""
+        game = MinesweeperGame(9, 9, 10, gui=False, lazy=True, seed=3)
+        game.process_event((0, 0))
+        for row in range(9):
+            for col in range(9):
+                expected = sum(1 for n in game.get_neighbors((row, col))
+                               if n in game.bomb_locations)
+                self.assertEqual(game.count_adjacent_bombs((row, col)), expected)
+        game.bomb_locations = {(1, 1)}
+        self.assertEqual(game.count_adjacent_bombs((0, 0)), 1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,152 @@
+"""Performance regression tests for the DSSP solver.
+
+These tests play fixed, seeded board corpora for each difficulty, with lazy
+games (every game played) and with eager games through run_games (games whose
+opener is a bomb are skipped). They check the exact number of wins and compare
+the throughput (games per second) with a baseline recorded per machine in
+perf_baseline.json. They are slow, so they only run when RUN_PERF_TESTS=1:
+
+    RUN_PERF_TESTS=1 python -m unittest test_performance
+
+The throughput checks are skipped until a baseline is recorded on the machine
+with UPDATE_PERF_BASELINE=1, which also records it again after an intended
+change. PERF_TOLERANCE (default 0.25) sets the allowed slowdown.
+"""
+import json
+import os
+import platform
+import random
+import time
+import unittest
+from minesweeper import MinesweeperGame
+from dssp_solver import MinesweeperSolverDSSP
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perf_baseline.json")
+TOLERANCE = float(os.environ.get("PERF_TOLERANCE", "0.25"))
+REPEATS = 3
+# Offset between the board seeds and the seeds of the solver's guesses
+SOLVER_SEED_OFFSET = 1_000_000
+# Seed of the global random stream for the eager corpora
+EAGER_SEED = 2024
+
+# name: (lazy, rows, cols, num_bombs, num_games, expected wins, expected games played)
+CORPORA = {
+    "beginner": (True, 9, 9, 10, 300, 219, 300),
+    "intermediate": (True, 16, 16, 40, 150, 67, 150),
+    "expert": (True, 16, 30, 99, 3000, 30, 3000),
+    "eager_beginner": (False, 9, 9, 10, 1000, 661, 888),
+    "eager_intermediate": (False, 16, 16, 40, 500, 178, 422),
+    "eager_expert": (False, 16, 30, 99, 3000, 24, 2391),
+}
+
+
+def play_corpus(rows: int, cols: int, num_bombs: int, num_games: int) -> int:
+    """
+    Play the seeded lazy corpus of a difficulty, opening in the corner.
+
+    Returns:
+        int: Number of games won.
+    """
+    solver = MinesweeperSolverDSSP(MinesweeperGame(rows, cols, num_bombs, gui=False, lazy=True))
+    solver.opener = (0, 0)
+    wins = 0
+    for seed in range(num_games):
+        random.seed(SOLVER_SEED_OFFSET + seed)
+        solver.game = MinesweeperGame(rows, cols, num_bombs, gui=False, lazy=True, seed=seed)
+        solver.step_solve()
+        if solver.game.check_win():
+            wins += 1
+    return wins
+
+
+def play_eager_corpus(rows: int, cols: int, num_bombs: int, num_games: int) -> float:
+    """
+    Play the seeded eager corpus of a difficulty through run_games, opening in the corner.
+
+    Returns:
+        float: Percentage of games won, as returned by run_games.
+    """
+    solver = MinesweeperSolverDSSP(MinesweeperGame(rows, cols, num_bombs, gui=False, lazy=True))
+    solver.opener = (0, 0)
+    random.seed(EAGER_SEED)
+    return solver.run_games(num_games, rows, cols, num_bombs)
+
+
+def machine_id() -> str:
+    """Identify the machine and interpreter the baseline was recorded on."""
+    return "/".join((platform.node(), platform.machine(), platform.python_implementation(),
+                     platform.python_version()))
+
+
+@unittest.skipUnless(os.environ.get("RUN_PERF_TESTS") == "1",
+                     "performance tests only run with RUN_PERF_TESTS=1")
+class TestSolverPerformance(unittest.TestCase):
+    """Performance regression tests for the DSSP solver."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load the baselines recorded on this machine."""
+        cls.baselines = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH, encoding="utf-8") as f:
+                cls.baselines = json.load(f)
+        cls.update = os.environ.get("UPDATE_PERF_BASELINE") == "1"
+
+    def check_corpus(self, name: str):
+        """Check the wins and the throughput of a corpus."""
+        lazy, rows, cols, num_bombs, num_games, expected_wins, expected_played = CORPORA[name]
+        best = float("inf")
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            if lazy:
+                wins = play_corpus(rows, cols, num_bombs, num_games)
+                self.assertEqual(wins, expected_wins, f"{name}: win count changed")
+            else:
+                # run_games only returns wins / played * 100, computed the same way here
+                win_rate = play_eager_corpus(rows, cols, num_bombs, num_games)
+                self.assertEqual(win_rate, expected_wins / expected_played * 100,
+                                 f"{name}: win rate changed")
+            best = min(best, time.perf_counter() - start)
+        games_per_second = num_games / best
+
+        machine = self.baselines.setdefault(machine_id(), {})
+        if self.update:
+            machine[name] = games_per_second
+            with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+                json.dump(self.baselines, f, indent=2, sort_keys=True)
+            return
+        if name not in machine:
+            self.skipTest(f"{name}: no baseline recorded for {machine_id()}, "
+                          "run with UPDATE_PERF_BASELINE=1 to record one")
+        minimum = machine[name] * (1 - TOLERANCE)
+        self.assertGreaterEqual(
+            games_per_second, minimum,
+            f"{name}: {games_per_second:.1f} games/s, baseline {machine[name]:.1f} games/s"
+        )
+
+    def test_beginner(self):
+        """Test the lazy beginner corpus (9x9, 10 bombs)."""
+        self.check_corpus("beginner")
+
+    def test_intermediate(self):
+        """Test the lazy intermediate corpus (16x16, 40 bombs)."""
+        self.check_corpus("intermediate")
+
+    def test_expert(self):
+        """Test the lazy expert corpus (16x30, 99 bombs)."""
+        self.check_corpus("expert")
+
+    def test_eager_beginner(self):
+        """Test the eager beginner corpus played through run_games."""
+        self.check_corpus("eager_beginner")
+
+    def test_eager_intermediate(self):
+        """Test the eager intermediate corpus played through run_games."""
+        self.check_corpus("eager_intermediate")
+
+    def test_eager_expert(self):
+        """Test the eager expert corpus played through run_games."""
+        self.check_corpus("eager_expert")
+
+if __name__ == "__main__":
+    unittest.main()
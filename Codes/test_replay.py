@@ -0,0 +1,124 @@
+"""Unit tests for the move log and the replayer."""
+import io
+import unittest
+from minesweeper import MinesweeperGame
+from dssp_solver import MinesweeperSolverDSSP
+from topology import TORUS
+from replay import (PROBE, FLAG, GUESS, MoveReplayer, attach_recorder, pack_event,
+                    read_games, render_board, unpack_event, write_game)
+
+class TestReplay(unittest.TestCase):
+    """Unit tests for the move log and the replayer."""
+
+    def setUp(self):
+        """Record a solved game on a known 5x5 grid."""
+        self.game = MinesweeperGame(5, 5, 4, gui=False)
+        self.game.bomb_locations = {(2, 3), (2, 1), (2, 4), (3, 3)}
+        self.recorder = attach_recorder(self.game, seed=42)
+        solver = MinesweeperSolverDSSP(self.game)
+        solver.opener = (0, 0)
+        solver.step_solve()
+
+    def test_pack_event(self):
+        """Test that events survive packing."""
+        for kind in (PROBE, FLAG, GUESS):
+            self.assertEqual(unpack_event(pack_event(kind, (1234, 32767))), (kind, (1234, 32767)))
+
+    def test_record_events(self):
+        """Test that probes and flags are recorded in order."""
+        events = [unpack_event(event) for event in self.recorder.events]
+        self.assertEqual(events[0], (PROBE, (0, 0)))
+        self.assertIn(FLAG, {kind for kind, _ in events})
+
+    def test_write_read_roundtrip(self):
+        """Test that a written game is read back unchanged."""
+        stream = io.BytesIO()
+        write_game(stream, self.game)
+        write_game(stream, self.game)
+        stream.seek(0)
+        records = read_games(stream)
+        self.assertEqual(len(records), 2)
+        record = records[0]
+        self.assertEqual((record.rows, record.cols, record.seed), (5, 5, 42))
+        self.assertEqual(set(record.bomb_locations), self.game.bomb_locations)
+        self.assertEqual(list(record.events), list(self.recorder.events))
+
+    def test_write_read_topology(self):
+        """Test that the topology of a game is stored in the log."""
+        game = MinesweeperGame(4, 4, 2, gui=False, lazy=True, topology=TORUS)
+        attach_recorder(game)
+        game.process_event((0, 0))
+        stream = io.BytesIO()
+        write_game(stream, game)
+        stream.seek(0)
+        record = read_games(stream)[0]
+        self.assertIs(record.topology, TORUS)
+        self.assertEqual(record.seed, game.seed)
+        replayed = MoveReplayer(record).seek(1)
+        self.assertEqual(replayed.revealed_cells, game.revealed_cells)
+
+    def test_write_too_large(self):
+        """Test that games the log cannot encode are rejected and the largest ones are not."""
+        game = MinesweeperGame(1, 32769, 0, gui=False, lazy=True)
+        attach_recorder(game)
+        with self.assertRaises(ValueError):
+            write_game(io.BytesIO(), game)
+
+        game = MinesweeperGame(2, 32768, 0, gui=False, lazy=True)
+        attach_recorder(game)
+        game.bomb_locations = set(game.cells)
+        with self.assertRaises(ValueError):
+            write_game(io.BytesIO(), game)
+
+        game.bomb_locations = {(1, 32767)}
+        game.place_flag((1, 32767))
+        stream = io.BytesIO()
+        write_game(stream, game)
+        stream.seek(0)
+        record = read_games(stream)[0]
+        self.assertEqual((record.rows, record.cols), (2, 32768))
+        self.assertEqual(unpack_event(record.events[0]), (FLAG, (1, 32767)))
+
+    def test_read_invalid_log(self):
+        """Test that a corrupted log is rejected."""
+        with self.assertRaises(ValueError):
+            read_games(io.BytesIO(b"not a move log at all"))
+
+    def test_seek(self):
+        """Test that seeking matches replaying from the start."""
+        stream = io.BytesIO()
+        write_game(stream, self.game)
+        stream.seek(0)
+        replayer = MoveReplayer(read_games(stream)[0], keyframe_interval=3)
+        self.assertEqual(len(replayer), len(self.recorder.events))
+        self.assertFalse(replayer.seek(0).revealed_cells)
+
+        final = replayer.seek(len(replayer))
+        self.assertEqual(final.revealed_cells, self.game.revealed_cells)
+        self.assertEqual(final.flags, self.game.flags)
+        self.assertTrue(final.check_win())
+
+        reference = replayer.new_game(gui=False)
+        for move, event in enumerate(replayer.record.events, start=1):
+            replayer.apply_event(reference, event)
+            self.assertEqual(render_board(replayer.seek(move)), render_board(reference))
+
+        with self.assertRaises(IndexError):
+            replayer.seek(len(replayer) + 1)
+
+    def test_run_games_move_log(self):
+        """Test that run_games writes one record per played game."""
+        stream = io.BytesIO()
+        solver = MinesweeperSolverDSSP(MinesweeperGame(5, 5, 3, gui=False))
+        solver.opener = (0, 0)
+        solver.run_games(5, 5, 5, 3, move_log=stream)
+        stream.seek(0)
+        records = read_games(stream)
+        self.assertGreater(len(records), 0)
+        for record in records:
+            self.assertNotIn((0, 0), record.bomb_locations)
+            game = MoveReplayer(record).seek(len(record.events))
+            self.assertTrue(game.game_over)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Unit tests for the solve-service."""
+import io
+import json
+import unittest
+import solve_service
+from solve_service import SolveService, analyze_position, parse_position, position_key
+
+POSITION = {"rows": 3, "cols": 3, "bombs": 1, "board": ["01.", "01.", "011"]}
+
+class TestSolveService(unittest.TestCase):
+    """Unit tests for the solve-service."""
+
+    def test_parse_position(self):
+        """Test parsing a player-visible position."""
+        rows, cols, bombs, _, revealed, flags = parse_position(
+            {"rows": 2, "cols": 2, "bombs": 1, "board": ["1F", ".1"]})
+        self.assertEqual((rows, cols, bombs), (2, 2, 1))
+        self.assertEqual(revealed, {(0, 0): 1, (1, 1): 1})
+        self.assertEqual(flags, {(0, 1)})
+        with self.assertRaises(ValueError):
+            parse_position({"rows": 2, "cols": 2, "bombs": 1, "board": ["1x", ".1"]})
+        with self.assertRaises(ValueError):
+            parse_position({"rows": 2, "cols": 2, "bombs": 1, "board": ["1"]})
+        # A corner has 3 neighbors on a rectangle and there is only 1 bomb
+        with self.assertRaises(ValueError):
+            parse_position({"rows": 2, "cols": 2, "bombs": 3, "board": ["4.", ".."]})
+        with self.assertRaises(ValueError):
+            parse_position({"rows": 2, "cols": 2, "bombs": 1, "board": ["2.", ".."]})
+        with self.assertRaises(ValueError):
+            parse_position({"rows": 2, "cols": 2, "bombs": 1, "board": "1..."})
+
+    def test_analyze_position(self):
+        """Test the safe cells, flags and guess of positions."""
+        result = analyze_position(POSITION)
+        self.assertEqual(result, {"safe": [[0, 2]], "flags": [[1, 2]], "guess": None})
+        # A flagged bomb makes its other neighbors safe
+        result = analyze_position({"rows": 3, "cols": 3, "bombs": 1,
+                                   "board": ["01.", "01F", "011"]})
+        self.assertEqual(result["safe"], [[0, 2]])
+        self.assertIsNone(result["guess"])
+        # Without information, the guess risk is the bomb density
+        result = analyze_position({"rows": 2, "cols": 5, "bombs": 2,
+                                   "board": [".....", "....."]})
+        self.assertEqual(result["guess"]["risk"], 0.2)
+
+    def test_position_key(self):
+        """Test that equal positions share a key."""
+        self.assertEqual(position_key(POSITION), position_key(dict(POSITION)))
+        self.assertNotEqual(position_key(POSITION),
+                            position_key(dict(POSITION, topology="torus")))
+
+    def test_serve_stream(self):
+        """Test pipelined requests, cache hits and errors through the stream protocol."""
+        service = SolveService(processes=1)
+        try:
+            requests = [
+                {"id": 1, "positions": [POSITION]},
+                {"id": 2, "positions": [POSITION, POSITION]},
+                {"id": 3},
+            ]
+            infile = io.StringIO("".join(json.dumps(r) + "\n" for r in requests) + "oops\n")
+            outfile = io.StringIO()
+            service.serve_stream(infile, outfile)
+            responses = [json.loads(line) for line in outfile.getvalue().splitlines()]
+            self.assertEqual([r["id"] for r in responses], [1, 2, 3, None])
+            self.assertEqual(responses[0]["results"][0], analyze_position(POSITION))
+            self.assertEqual(responses[1]["results"], [analyze_position(POSITION)] * 2)
+            self.assertIn("error", responses[2])
+            self.assertIn("error", responses[3])
+            # Invalid positions fail alone, the valid ones of the batch are answered
+            response = service.submit({"id": 4, "positions": [
+                {"rows": 3, "bombs": 1}, POSITION, dict(POSITION, board=["09.", "01.", "011"])
+            ]}).result()
+            self.assertIn("error", response["results"][0])
+            self.assertEqual(response["results"][1], analyze_position(POSITION))
+            self.assertIn("error", response["results"][2])
+            # A repeated position is answered from the cache
+            response = service.submit({"id": 5, "positions": [POSITION]})
+            self.assertEqual(response.sources, {})
+            self.assertGreater(service.hits, 0)
+        finally:
+            service.close()
+
+    def test_coalesce_inflight(self):
+        """Test that a position being computed is not sent to the pool twice."""
+        service = SolveService(processes=1)
+        try:
+            position = dict(POSITION, board=["0F.", "01.", "011"])
+            first = service.submit({"id": 1, "positions": [position]})
+            second = service.submit({"id": 2, "positions": [position]})
+            self.assertIs(first.sources[position_key(position)][0],
+                          second.sources[position_key(position)][0])
+            self.assertEqual(second.result()["results"], first.result()["results"])
+            self.assertEqual(service.inflight, {})
+            self.assertIn(position_key(position), service.cache)
+        finally:
+            service.close()
+
+    def test_solver_cache_bounded(self):
+        """Test that a worker keeps a bounded number of warm solvers."""
+        for bombs in range(1, solve_service.SOLVER_CACHE_SIZE + 5):
+            analyze_position({"rows": 9, "cols": 9, "bombs": bombs, "board": ["." * 9] * 9})
+        self.assertLessEqual(len(solve_service._solvers),  # pylint: disable=protected-access
+                             solve_service.SOLVER_CACHE_SIZE)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""Unit tests for the neighborhood topologies."""
+import unittest
+from minesweeper import MinesweeperGame
+from dssp_solver import MinesweeperSolverDSSP
+from topology import (COMPILE_CACHE_SIZE, HEX, RECTANGLE, TORUS, RectangleTopology,
+                      Topology)
+
+class TestTopology(unittest.TestCase):
+    """Unit tests for the neighborhood topologies."""
+
+    def test_rectangle(self):
+        """Test the bounded 8-neighborhood."""
+        game = MinesweeperGame(4, 5, 3, gui=False)
+        self.assertIs(game.topology, RECTANGLE)
+        self.assertEqual(sorted(game.get_neighbors((0, 0))), [(0, 1), (1, 0), (1, 1)])
+        self.assertEqual(len(game.get_neighbors((2, 2))), 8)
+
+    def test_torus(self):
+        """Test that every cell of a torus has 8 distinct neighbors."""
+        game = MinesweeperGame(5, 6, 3, gui=False, topology=TORUS)
+        for cell in game.cells:
+            neighbors = game.get_neighbors(cell)
+            self.assertEqual(len(set(neighbors)), 8)
+            self.assertNotIn(cell, neighbors)
+        self.assertIn((4, 5), game.get_neighbors((0, 0)))
+        # Thin grids do not count a neighbor twice
+        thin = MinesweeperGame(2, 2, 1, gui=False, topology=TORUS)
+        self.assertEqual(sorted(thin.get_neighbors((0, 0))), [(0, 1), (1, 0), (1, 1)])
+
+    def test_hex(self):
+        """Test the 6-neighborhood of even and odd rows."""
+        game = MinesweeperGame(5, 5, 3, gui=False, topology=HEX)
+        self.assertEqual(sorted(game.get_neighbors((2, 2))),
+                         [(1, 1), (1, 2), (2, 1), (2, 3), (3, 1), (3, 2)])
+        self.assertEqual(sorted(game.get_neighbors((1, 2))),
+                         [(0, 2), (0, 3), (1, 1), (1, 3), (2, 2), (2, 3)])
+
+    def test_symmetric_adjacency(self):
+        """Test that adjacency is symmetric for every topology."""
+        for topology in (RECTANGLE, TORUS, HEX):
+            game = MinesweeperGame(4, 7, 3, gui=False, topology=topology)
+            for cell in game.cells:
+                for neighbor in game.get_neighbors(cell):
+                    self.assertIn(cell, game.get_neighbors(neighbor))
+
+    def test_compile_cache(self):
+        """Test that games of the same size share the compiled adjacency."""
+        first = MinesweeperGame(6, 6, 3, gui=False, topology=HEX)
+        second = MinesweeperGame(6, 6, 3, gui=False, topology=HEX)
+        self.assertIs(first.adjacency, second.adjacency)
+        self.assertIs(first.cells, second.cells)
+
+    def test_compile_cache_bounded(self):
+        """Test that the compile cache evicts the least recently used grid sizes."""
+        topology = RectangleTopology()
+        first = topology.compile(1, 1)
+        for cols in range(2, COMPILE_CACHE_SIZE + 1):
+            topology.compile(1, cols)
+        self.assertIs(topology.compile(1, 1), first)  # Now the most recently used
+        topology.compile(2, 1)
+        self.assertEqual(len(topology._compiled), COMPILE_CACHE_SIZE)
+        self.assertNotIn((1, 2), topology._compiled)
+        self.assertIs(topology.compile(1, 1), first)
+
+    def test_abstract_topology(self):
+        """Test that a topology without neighbors cannot be instantiated."""
+        class Incomplete(Topology):
+            """Topology missing its neighbors method."""
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_torus_counts(self):
+        """Test that bomb counts wrap around the edges of a torus."""
+        game = MinesweeperGame(5, 5, 1, gui=False, topology=TORUS)
+        game.bomb_locations = {(4, 4)}
+        self.assertEqual(game.count_adjacent_bombs((0, 0)), 1)
+        self.assertEqual(game.count_adjacent_bombs((2, 2)), 0)
+
+    def test_run_games_topologies(self):
+        """Test that the solver plays on every topology."""
+        solver = MinesweeperSolverDSSP(MinesweeperGame(6, 6, 4, gui=False))
+        for topology in (TORUS, HEX):
+            win_rate = solver.run_games(5, 6, 6, 4, lazy=True, topology=topology)
+            self.assertTrue(0 <= win_rate <= 100)
+
+if __name__ == "__main__":
+    unittest.main()
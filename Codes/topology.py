@@ -0,0 +1,133 @@
+"""
+This module contains the neighborhood topologies of the Minesweeper grid.
+
+A topology describes which cells are adjacent. It is compiled once per grid
+size into a CSR-style adjacency: the neighbors of the cell at flat index
+i = row * cols + col are adjacency[offsets[i]:offsets[i + 1]], stored as flat
+indices too. The game, the count grid and the DSSP rules only read this array.
+"""
+
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+
+# Maximum number of compiled grid sizes kept by a topology
+COMPILE_CACHE_SIZE = 32
+
+
+class Topology(ABC):
+    """
+    Base class of the neighborhood topologies.
+
+    Attributes:
+        name (str): Name of the topology.
+        code (int): Identifier of the topology in the move log.
+    """
+
+    name = ""
+    code = -1
+
+    def __init__(self):
+        """Initialize the cache of compiled adjacencies, least recently used first."""
+        self._compiled = OrderedDict()
+
+    @abstractmethod
+    def neighbors(self, row: int, col: int, rows: int, cols: int) -> list:
+        """
+        Get the neighboring cells of a cell.
+
+        Args:
+            row (int): Row of the cell.
+            col (int): Column of the cell.
+            rows (int): Number of rows in the grid.
+            cols (int): Number of columns in the grid.
+
+        Returns:
+            list: List of neighboring cell coordinates, without duplicates.
+        """
+
+    def compile(self, rows: int, cols: int) -> tuple:
+        """
+        Compile the adjacency of a grid, caching the COMPILE_CACHE_SIZE most
+        recently used grid sizes.
+
+        Args:
+            rows (int): Number of rows in the grid.
+            cols (int): Number of columns in the grid.
+
+        Returns:
+            tuple: The offsets and adjacency arrays, and the list of cell
+                coordinates by flat index.
+        """
+        key = (rows, cols)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            offsets = array("i", [0])
+            adjacency = array("i")
+            cells = [(row, col) for row in range(rows) for col in range(cols)]
+            for row, col in cells:
+                for n_row, n_col in self.neighbors(row, col, rows, cols):
+                    adjacency.append(n_row * cols + n_col)
+                offsets.append(len(adjacency))
+            compiled = self._compiled[key] = (offsets, adjacency, cells)
+            if len(self._compiled) > COMPILE_CACHE_SIZE:
+                self._compiled.popitem(last=False)
+        else:
+            self._compiled.move_to_end(key)
+        return compiled
+
+
+class RectangleTopology(Topology):
+    """The classic 8-neighborhood on a bounded rectangle."""
+
+    name = "rectangle"
+    code = 0
+
+    def neighbors(self, row, col, rows, cols):
+        return [
+            (row + dr, col + dc)
+            for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+            if (dr or dc) and 0 <= row + dr < rows and 0 <= col + dc < cols
+        ]
+
+
+class TorusTopology(Topology):
+    """The 8-neighborhood on a rectangle whose opposite edges are joined."""
+
+    name = "torus"
+    code = 1
+
+    def neighbors(self, row, col, rows, cols):
+        # dict.fromkeys keeps the order and drops duplicates on grids thinner than 3 cells
+        cells = dict.fromkeys(
+            ((row + dr) % rows, (col + dc) % cols)
+            for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+        )
+        cells.pop((row, col), None)
+        return list(cells)
+
+
+class HexTopology(Topology):
+    """
+    The 6-neighborhood of a hexagonal grid stored in offset coordinates,
+    odd rows being shifted half a cell to the right.
+    """
+
+    name = "hex"
+    code = 2
+
+    def neighbors(self, row, col, rows, cols):
+        shift = row % 2  # Diagonal neighbors lean right on odd rows
+        candidates = [
+            (row - 1, col - 1 + shift), (row - 1, col + shift),
+            (row, col - 1), (row, col + 1),
+            (row + 1, col - 1 + shift), (row + 1, col + shift),
+        ]
+        return [(r, c) for r, c in candidates if 0 <= r < rows and 0 <= c < cols]
+
+
+RECTANGLE = RectangleTopology()
+TORUS = TorusTopology()
+HEX = HexTopology()
+
+TOPOLOGIES = {topology.code: topology for topology in (RECTANGLE, TORUS, HEX)}